@@ -1,21 +1,28 @@
 import os
 import re
+import json
 import time
+import random
 import yaml
+import asyncio
 import logging
-import requests
-import glob
+import aiohttp
+import ijson
 import threading
 import urllib.parse
-from datetime import datetime, timedelta
-from slack_sdk import WebClient
+from datetime import datetime
+from slack_sdk.web.async_client import AsyncWebClient
 from slack_sdk.errors import SlackApiError
-from typing import List, Dict, Optional
-from dataclasses import dataclass
-from collections import defaultdict
-from flask import Flask, jsonify
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from typing import List, Dict, Hashable, Optional
+from dataclasses import dataclass, field
+from collections import defaultdict, deque, OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 # Configure logging
 logging.basicConfig(
@@ -24,9 +31,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize Flask app
-app = Flask(__name__)
-
 # Global state for health check
 app_state = {
     'configs_loaded': False,
@@ -36,16 +40,26 @@ app_state = {
     'loki_connection_attempts': 0
 }
 
-# Configure retry strategy for requests
-retry_strategy = Retry(
-    total=3,  # number of retries
-    backoff_factor=1,  # wait 1, 2, 4 seconds between retries
-    status_forcelist=[500, 502, 503, 504]  # HTTP status codes to retry on
-)
-adapter = HTTPAdapter(max_retries=retry_strategy)
-http = requests.Session()
-http.mount("http://", adapter)
-http.mount("https://", adapter)
+# Configure retry strategy for HTTP requests
+RETRY_TOTAL = 3  # number of retries
+RETRY_BACKOFF_FACTOR = 0.2  # wait 0.2, 0.4, 0.8 seconds between retries
+RETRY_BACKOFF_JITTER = 0.5  # plus up to this many random seconds
+RETRY_STATUS_FORCELIST = {500, 502, 503, 504}  # HTTP status codes to retry on
+
+# Per-cycle work limits, so a log storm can't stall the polling loop
+MAX_MATCHES_PER_CYCLE = 100  # stop collecting matches after this many
+MAX_LINE_LENGTH = 10000  # skip log lines longer than this
+
+# Slack message limits
+SLACK_MAX_BLOCKS = 50  # maximum blocks per message
+SLACK_MAX_SECTION_CHARS = 3000  # maximum text length of a section block
+SLACK_MAX_MESSAGE_CHARS = 4000  # text budget across all blocks of a message
+SLACK_MAX_RETRIES = 3  # rate-limit retries per notification run
+SLACK_MAX_RETRY_WAIT = 5  # longest Retry-After, in seconds, worth waiting for within a cycle
+SLACK_TIMEOUT = 30  # seconds per API call, matching slack_sdk's own default
+
+# Matches the app label in a Loki stream selector like {app="my-app"}
+APP_LABEL_PATTERN = re.compile(r'app\s*=\s*"([^"]+)"')
 
 @dataclass
 class LokiConfig:
@@ -57,6 +71,27 @@ class LokiConfig:
     region_text: str = "default-region"
     alert_name: str = "PatternMatchFound"  # Custom alert name
     description: str = ""  # Optional description for the alert
+    logql_pattern: str = field(init=False, repr=False)  # Pattern escaped for a LogQL line filter
+    logql_filter: str = field(init=False, repr=False)  # Line filter appended to the query
+    logql_query: str = field(init=False, repr=False)  # Full query sent to Loki
+    interval_seconds: int = field(init=False, repr=False)
+    app_name: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # Replace spaces with \s+ for Loki's LogQL syntax
+        pattern = self.pattern.replace(" ", "\\s+")
+        # Escape other special characters that need escaping in LogQL
+        self.logql_pattern = pattern.replace("\\", "\\\\").replace('"', '\\"')
+        # All filtering happens in Loki; plain substrings use the cheaper |= filter instead of |~
+        if self.pattern == ".*":  # Only add pattern if it's not the default
+            self.logql_filter = ""
+        elif re.escape(self.pattern) == self.pattern:
+            self.logql_filter = f' |= "{self.logql_pattern}"'
+        else:
+            self.logql_filter = f' |~ "{self.logql_pattern}"'
+        self.logql_query = self.query.strip() + self.logql_filter
+        self.interval_seconds = parse_interval(self.interval)
+        self.app_name = extract_app_from_query(self.query)
 
 @dataclass
 class SlackConfig:
@@ -68,29 +103,87 @@ class Config:
     loki: LokiConfig
     slack: SlackConfig
     name: str  # Added name field to identify different configs
+    client: Optional[AsyncWebClient] = field(default=None, init=False, repr=False)  # Set by run_main_loop
+    slack_template: str = field(init=False, repr=False)  # Slack message with {ts} and {msg} placeholders
+
+    def __post_init__(self):
+        # Fill in everything that is constant per config once, escaping braces in
+        # config values so only the {ts} and {msg} placeholders remain
+        def escape(value: str) -> str:
+            return value.replace("{", "{{").replace("}", "}}")
+
+        template = (
+            "{emoji} *{region}* :fire: *{alert}*\n"
+            "> App: {app}\n"
+            "> Timestamp: {{ts}}\n"
+            "> Message: {{msg}}"
+        )
+        if self.loki.description:
+            template += "\n> Description: {desc}"
+        self.slack_template = template.format(
+            emoji=escape(self.loki.region_emoji),
+            region=escape(self.loki.region_text),
+            alert=escape(self.loki.alert_name),
+            app=escape(self.loki.app_name),
+            desc=escape(self.loki.description)
+        )
+
+@dataclass(slots=True)
+class LogEntry:
+    timestamp_ns: int
+    message: str
 
 class MessageCache:
-    def __init__(self, window_minutes: int = 5):
-        self.window_minutes = window_minutes
-        self.messages: Dict[str, datetime] = {}
+    def __init__(self, window_minutes: int = 5, max_size: int = 10000):
+        self.window = window_minutes * 60.0  # Window in seconds
+        self.max_size = max_size
+        # Kept in insertion order, which is also timestamp order, oldest first.
+        # Timestamps come from time.monotonic() so wall-clock jumps don't affect the window.
+        self.messages: OrderedDict[Hashable, float] = OrderedDict()
 
-    def add_message(self, message: str):
-        self.messages[message] = datetime.now()
+    def add_message(self, message: Hashable):
+        self.messages[message] = time.monotonic()
+        self.messages.move_to_end(message)
         self._cleanup()
+        # Evict the oldest entries once the cache is full
+        if len(self.messages) > self.max_size:
+            self.messages.popitem(last=False)
 
-    def has_message(self, message: str) -> bool:
-        self._cleanup()
-        return message in self.messages
+    def has_message(self, message: Hashable) -> bool:
+        # A miss returns after a single lookup; only a hit needs its age checked
+        timestamp = self.messages.get(message)
+        return timestamp is not None and time.monotonic() - timestamp < self.window
 
     def _cleanup(self):
-        cutoff = datetime.now() - timedelta(minutes=self.window_minutes)
-        self.messages = {msg: time for msg, time in self.messages.items() if time > cutoff}
+        cutoff = time.monotonic() - self.window
+        # Drop expired entries from the front, stopping at the first one still in the window
+        while self.messages and next(iter(self.messages.values())) <= cutoff:
+            self.messages.popitem(last=False)
+
+async def http_get(session: aiohttp.ClientSession, url: str, params: Optional[Dict[str, str]] = None,
+                   timeout: float = 10) -> aiohttp.ClientResponse:
+    """GET a URL, retrying connection errors and retryable status codes with exponential backoff."""
+    for attempt in range(RETRY_TOTAL + 1):
+        try:
+            response = await session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=timeout))
+            if response.status not in RETRY_STATUS_FORCELIST or attempt == RETRY_TOTAL:
+                if response.status >= 400:
+                    # raise_for_status discards the body, which holds Loki's explanation of the error
+                    logger.error(f"Response text: {await response.text(errors='replace')}")
+                response.raise_for_status()
+                return response
+            response.release()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == RETRY_TOTAL:
+                raise
+        backoff = RETRY_BACKOFF_FACTOR * (2 ** attempt) + random.uniform(0, RETRY_BACKOFF_JITTER)
+        await asyncio.sleep(backoff)
 
-def check_loki_connection(endpoint: str) -> bool:
+async def check_loki_connection(session: aiohttp.ClientSession, endpoint: str) -> bool:
     """Check if Loki endpoint is accessible."""
     try:
-        response = http.get(f"{endpoint}/ready", timeout=5)
-        response.raise_for_status()
+        response = await http_get(session, f"{endpoint}/ready", timeout=5)
+        response.release()
         app_state['loki_connected'] = True
         app_state['loki_connection_attempts'] = 0
         return True
@@ -100,30 +193,46 @@ def check_loki_connection(endpoint: str) -> bool:
         app_state['loki_connection_attempts'] += 1
         return False
 
-def wait_for_loki_connection(endpoint: str, max_attempts: int = 10) -> bool:
+async def wait_for_loki_connection(session: aiohttp.ClientSession, endpoint: str, max_attempts: int = 10) -> bool:
     """Wait for Loki to become available with exponential backoff."""
     attempt = 0
     while attempt < max_attempts:
-        if check_loki_connection(endpoint):
+        if await check_loki_connection(session, endpoint):
             logger.info("Successfully connected to Loki")
             return True
         
         # Exponential backoff: 2^attempt seconds
-        wait_time = min(2 ** attempt, 60)  # Cap at 60 seconds
+        wait_time = min(2 ** attempt, 10)  # Cap at 10 seconds
         logger.info(f"Waiting {wait_time} seconds before next connection attempt...")
-        time.sleep(wait_time)
+        await asyncio.sleep(wait_time)
         attempt += 1
     
     logger.error(f"Failed to connect to Loki after {max_attempts} attempts")
     return False
 
+def check_pattern(config_name: str, pattern: str):
+    """Warn about pattern shapes that make Loki's line filter needlessly expensive."""
+    if pattern == ".*":  # The default pattern is never sent to Loki
+        return
+    # Line filters are unanchored, so leading/trailing .* only add work. A trailing .*
+    # repeats an escaped dot when preceded by an odd number of backslashes (\.*, not \\.*)
+    trailing = pattern.endswith(".*")
+    if trailing:
+        prefix = pattern[:-2]
+        trailing = (len(prefix) - len(prefix.rstrip("\\"))) % 2 == 0
+    if pattern.startswith(".*") or trailing:
+        logger.warning(
+            f"Pattern {pattern!r} in config {config_name} starts or ends with '.*'; "
+            f"line filters already match anywhere in the line, so the wildcard only slows matching"
+        )
+
 def load_config(config_path: str) -> List[Config]:
     """Load configuration from a YAML file with environment variable support."""
     configs = []
     
     try:
         with open(config_path, 'r') as f:
-            config_data = yaml.safe_load(f)
+            config_data = yaml.load(f, Loader=SafeLoader)
             
         # Get config name from filename
         config_name = os.path.splitext(os.path.basename(config_path))[0]
@@ -139,6 +248,7 @@ def load_config(config_path: str) -> List[Config]:
             alert_name=os.getenv('ALERT_NAME', config_data['loki'].get('alert_name', 'PatternMatchFound')),
             description=os.getenv('DESCRIPTION', config_data['loki'].get('description', ''))
         )
+        check_pattern(config_name, loki_config.pattern)
             
         # Load Slack config with environment variable fallback
         slack_config = SlackConfig(
@@ -160,55 +270,92 @@ def load_config(config_path: str) -> List[Config]:
 
 def extract_app_from_query(query: str) -> str:
     """Extract the app name from a Loki query string like {app="my-app"}"""
-    match = re.search(r'app\s*=\s*"([^"]+)"', query)
+    match = APP_LABEL_PATTERN.search(query)
     if match:
         return match.group(1)
     return "unknown"
 
-def send_slack_notification(config: Config, log_entry: tuple, cache: MessageCache):
-    timestamp_ns, log_message = log_entry
-    if cache.has_message(timestamp_ns):  # Use timestamp as the deduplication key
-        return
-    try:
-        # Format timestamp
-        ts = datetime.fromtimestamp(int(timestamp_ns) / 1e9).strftime('%Y-%m-%d %H:%M:%S')
-        # Extract app name
-        app_name = extract_app_from_query(config.loki.query)
-        # Use emoji and region text from config
-        region_emoji = config.loki.region_emoji
-        region_text = config.loki.region_text
-        # Format Slack message
-        slack_text = (
-            f"{region_emoji} *{region_text}* :fire: *{config.loki.alert_name}*\n"
-            f"> App: {app_name}\n"
-            f"> Timestamp: {ts}\n"
-            f"> Message: {log_message}"
-        )
-        if config.loki.description:
-            slack_text += f"\n> Description: {config.loki.description}"
-        client = WebClient(token=config.slack.token)
-        response = client.chat_postMessage(
-            channel=config.slack.channel,
-            text=slack_text
-        )
-        if response['ok']:
-            cache.add_message(timestamp_ns)  # Use timestamp as the deduplication key
-            logger.info(f"Notification sent to Slack for config {config.name}")
-    except SlackApiError as e:
-        logger.error(f"Error sending Slack notification: {str(e)}")
-        app_state['error_count'] += 1
+def format_slack_text(config: Config, log_entry: LogEntry) -> str:
+    """Format a single log entry as Slack mrkdwn."""
+    # Format timestamp
+    ts = datetime.fromtimestamp(log_entry.timestamp_ns / 1e9).strftime('%Y-%m-%d %H:%M:%S')
+    # Format Slack message
+    slack_text = config.slack_template.format(ts=ts, msg=log_entry.message)
+    # Slack rejects section blocks with longer text
+    if len(slack_text) > SLACK_MAX_SECTION_CHARS:
+        slack_text = slack_text[:SLACK_MAX_SECTION_CHARS - 1] + "\u2026"
+    return slack_text
+
+def batch_slack_blocks(config: Config, log_entries: List[LogEntry]) -> List[tuple]:
+    """Split log entries into (entries, blocks) batches that fit Slack's per-message block and text limits."""
+    batches = []
+    batch, blocks, length = [], [], 0
+    for log_entry in log_entries:
+        text = format_slack_text(config, log_entry)
+        if blocks and (len(blocks) >= SLACK_MAX_BLOCKS or length + len(text) > SLACK_MAX_MESSAGE_CHARS):
+            batches.append((batch, blocks))
+            batch, blocks, length = [], [], 0
+        batch.append(log_entry)
+        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": text}})
+        length += len(text)
+    if blocks:
+        batches.append((batch, blocks))
+    return batches
+
+async def send_slack_notifications(config: Config, log_entries: List[LogEntry], cache: MessageCache):
+    """Send new log entries to Slack, one section block per entry and one message per batch of blocks."""
+    # Use config name and timestamp as the deduplication key, so configs sharing
+    # a Loki query each get notified about the same log entry
+    new_entries = []
+    seen = set()
+    for log_entry in log_entries:
+        key = (config.name, log_entry.timestamp_ns)
+        if key in seen or cache.has_message(key):
+            continue
+        seen.add(key)
+        new_entries.append(log_entry)
 
-def query_loki(config: Config) -> List[tuple]:
-    """Query Loki for logs matching the pattern. Returns list of (timestamp, message) tuples."""
+    # Loki returns entries newest first, so the first batch holds the newest entries.
+    # Batches are popped from the right, so reverse them to send the newest first; a
+    # rate-limited batch goes back on top of the stack and keeps the retries while
+    # older batches wait instead of all timing out
+    pending = deque(reversed(batch_slack_blocks(config, new_entries)))
+    retries = 0
+    while pending:
+        batch, blocks = pending.pop()
+        try:
+            response = await config.client.chat_postMessage(
+                channel=config.slack.channel,
+                text=f"{config.loki.alert_name}: {len(batch)} matching log(s)",  # Fallback for notifications
+                blocks=blocks
+            )
+            if response['ok']:
+                for log_entry in batch:
+                    cache.add_message((config.name, log_entry.timestamp_ns))
+                logger.info(f"Notification with {len(batch)} log(s) sent to Slack for config {config.name}")
+        except SlackApiError as e:
+            retry_after = int(e.response.headers.get('Retry-After', 1))
+            # Waiting here holds up the whole polling cycle, so only retry short waits
+            if e.response.status_code == 429 and retries < SLACK_MAX_RETRIES and retry_after <= SLACK_MAX_RETRY_WAIT:
+                retries += 1
+                logger.warning(f"Slack rate limit hit for config {config.name}, retrying in {retry_after} seconds")
+                await asyncio.sleep(retry_after)
+                pending.append((batch, blocks))
+                continue
+            logger.error(f"Error sending Slack notification: {str(e)}")
+            app_state['error_count'] += 1
+
+async def query_loki_async(session: aiohttp.ClientSession, config: Config) -> List[LogEntry]:
+    """Query Loki for logs matching the pattern. Returns list of LogEntry objects."""
     try:
         # Check Loki connection before querying
         if not app_state['loki_connected']:
-            if not wait_for_loki_connection(config.loki.endpoint):
+            if not await wait_for_loki_connection(session, config.loki.endpoint):
                 return []
 
         # Calculate the time range based on the interval
         current_time = time.time()
-        interval_seconds = parse_interval(config.loki.interval)
+        interval_seconds = config.loki.interval_seconds
         
         # Ensure end time is current time and start time is interval seconds before
         end_time = int(current_time * 1e9)  # Current time in nanoseconds
@@ -220,13 +367,7 @@ def query_loki(config: Config) -> List[tuple]:
             return []
         
         # Construct the query with proper encoding
-        base_query = config.loki.query.strip()
-        if config.loki.pattern != ".*":  # Only add pattern if it's not the default
-            # Replace spaces with \s+ for Loki's LogQL syntax
-            pattern = config.loki.pattern.replace(" ", "\\s+")
-            # Escape other special characters that need escaping in LogQL
-            pattern = pattern.replace("\\", "\\\\").replace('"', '\\"')
-            base_query = f'{base_query} |~ "{pattern}"'
+        base_query = config.loki.logql_query
         
         # Prepare the query parameters with proper timestamp formatting
         query_params = {
@@ -242,32 +383,44 @@ def query_loki(config: Config) -> List[tuple]:
         logger.debug(f"Time range: {datetime.fromtimestamp(current_time - interval_seconds)} to {datetime.fromtimestamp(current_time)}")
         
         # Make the request to Loki
-        response = http.get(
+        response = await http_get(
+            session,
             f"{config.loki.endpoint}/loki/api/v1/query_range",
             params=query_params,
             timeout=10
         )
-        response.raise_for_status()
-        
-        # Parse the response
-        data = response.json()
-        if 'data' not in data or 'result' not in data['data']:
-            return []
         
-        # Extract log lines as (timestamp, message) tuples
+        # Extract log lines as LogEntry objects, streaming the response one
+        # stream at a time instead of materializing the whole JSON document
         matching_logs = []
-        for stream in data['data']['result']:
-            for value in stream['values']:
-                log_line = value[1]  # The log message is the second element
-                timestamp_ns = value[0]  # The timestamp in nanoseconds
-                matching_logs.append((timestamp_ns, log_line))
+        skipped = 0
+        truncated = False
+        try:
+            async for stream in ijson.items_async(response.content, 'data.result.item'):
+                for value in stream['values']:
+                    log_line = value[1]  # The log message is the second element
+                    if len(log_line) > MAX_LINE_LENGTH:
+                        skipped += 1
+                        continue
+                    # Only stop once a match beyond the cap actually exists
+                    if len(matching_logs) >= MAX_MATCHES_PER_CYCLE:
+                        truncated = True
+                        break
+                    timestamp_ns = int(value[0])  # The timestamp in nanoseconds
+                    matching_logs.append(LogEntry(timestamp_ns, log_line))
+                if truncated:
+                    logger.warning(f"Truncated at {MAX_MATCHES_PER_CYCLE} matches for config {config.name}")
+                    break
+        finally:
+            response.release()
+        
+        if skipped:
+            logger.warning(f"Skipped {skipped} log line(s) longer than {MAX_LINE_LENGTH} characters for config {config.name}")
         
         return matching_logs
         
-    except requests.exceptions.RequestException as e:
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         logger.error(f"Error querying Loki: {str(e)}")
-        if hasattr(e.response, 'text'):
-            logger.error(f"Response text: {e.response.text}")
         app_state['error_count'] += 1
         app_state['loki_connected'] = False
         return []
@@ -290,39 +443,119 @@ def parse_interval(interval: str) -> int:
     else:
         raise ValueError(f"Invalid interval unit: {unit}")
 
-@app.route('/health')
 def health_check():
-    """Health check endpoint for Kubernetes liveness probe."""
+    """Health check endpoint for Kubernetes liveness probe. Returns (body, status code)."""
     if not app_state['configs_loaded']:
-        return jsonify({
+        return {
             'status': 'error',
             'message': 'No configurations loaded'
-        }), 503
+        }, 503
     
     if app_state['error_count'] > 10:  # Too many errors
-        return jsonify({
+        return {
             'status': 'error',
             'message': f'Too many errors: {app_state["error_count"]}'
-        }), 503
+        }, 503
     
     if not app_state['loki_connected']:
-        return jsonify({
+        return {
             'status': 'error',
             'message': 'Loki connection lost',
             'connection_attempts': app_state['loki_connection_attempts']
-        }), 503
+        }, 503
     
-    return jsonify({
+    return {
         'status': 'healthy',
         'configs_loaded': app_state['configs_loaded'],
         'last_check': app_state['last_check'],
         'error_count': app_state['error_count'],
         'loki_connected': app_state['loki_connected']
-    }), 200
+    }, 200
+
+def group_configs(configs: List[Config]) -> List[List[Config]]:
+    """Group configs that would send the exact same Loki request, so it is only made once per cycle."""
+    groups = defaultdict(list)
+    for config in configs:
+        groups[(config.loki.endpoint, config.loki.logql_query, config.loki.interval_seconds)].append(config)
+    return list(groups.values())
+
+async def process_configs(session: aiohttp.ClientSession, configs: List[Config], cache: MessageCache):
+    """Query Loki once for a group of configs and send notifications for matching logs to each of them."""
+    try:
+        # Query Loki for matching logs
+        matching_logs = await query_loki_async(session, configs[0])
+    except Exception as e:
+        logger.error(f"Error processing config(s) {', '.join(config.name for config in configs)}: {str(e)}")
+        app_state['error_count'] += 1
+        return
+    
+    # Send notifications for the matching logs in batches, so one config's
+    # failure doesn't stop the others in the group from being notified
+    for config in configs:
+        try:
+            await send_slack_notifications(config, matching_logs, cache)
+        except Exception as e:
+            logger.error(f"Error processing config {config.name}: {str(e)}")
+            app_state['error_count'] += 1
+
+async def run_main_loop(configs: List[Config], cache: MessageCache):
+    """Poll Loki for all configs concurrently, reusing the HTTP sessions across cycles."""
+    config_groups = group_configs(configs)
+    if len(config_groups) < len(configs):
+        logger.info(f"Sharing Loki queries: {len(configs)} config(s) need {len(config_groups)} request(s) per cycle")
+    
+    # Sleep for the shortest interval among all configs
+    min_interval = min(config.loki.interval_seconds for config in configs)
+    
+    # trust_env honours HTTP(S)_PROXY/NO_PROXY, as requests did
+    async with aiohttp.ClientSession(trust_env=True) as session, \
+            aiohttp.ClientSession(trust_env=True, timeout=aiohttp.ClientTimeout(total=SLACK_TIMEOUT)) as slack_session:
+        # One Slack client per config, reusing pooled keep-alive connections instead of
+        # opening a new session for every API call; Slack gets its own pool so posts
+        # never take connections from the Loki queries. slack_sdk ignores its own timeout
+        # for a session it didn't create, so the session sets it instead
+        for config in configs:
+            config.client = AsyncWebClient(token=config.slack.token, session=slack_session)
+        
+        while True:
+            # Overlap the Loki round-trips of all config groups
+            await asyncio.gather(*[process_configs(session, group, cache) for group in config_groups])
+            
+            # Update last check time
+            app_state['last_check'] = datetime.now().isoformat()
+            
+            await asyncio.sleep(min_interval)
+
+class HealthHandler(BaseHTTPRequestHandler):
+    """Serves the /health endpoint."""
 
-def run_flask():
-    """Run the Flask application."""
-    app.run(host='0.0.0.0', port=8080)
+    def do_GET(self):
+        self._respond(include_body=True)
+
+    def do_HEAD(self):
+        self._respond(include_body=False)
+
+    def _respond(self, include_body: bool):
+        # Match on the path only, ignoring any query string
+        if urllib.parse.urlsplit(self.path).path == '/health':
+            body, status = health_check()
+        else:
+            body, status = {'status': 'error', 'message': 'Not found'}, 404
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if include_body:
+            self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # Keep probe requests out of the default stderr access log
+        logger.debug(f"Health server: {format % args}")
+
+def run_health_server():
+    """Run the health check HTTP server."""
+    ThreadingHTTPServer(('0.0.0.0', 8080), HealthHandler).serve_forever()
 
 def main():
     # Create configuration directory if it doesn't exist
@@ -333,7 +566,11 @@ def main():
     cache = MessageCache()
     
     # Load all configuration files
-    config_files = glob.glob(os.path.join(config_dir, "*.yaml"))
+    config_files = [
+        entry.path for entry in os.scandir(config_dir)
+        # Skip hidden entries like glob does, e.g. the ..data links of a mounted ConfigMap
+        if entry.name.endswith(".yaml") and not entry.name.startswith(".") and entry.is_file()
+    ]
     if not config_files:
         logger.error(f"No configuration files found in {config_dir}")
         app_state['configs_loaded'] = False
@@ -349,35 +586,15 @@ def main():
             logger.info(f"Loaded {len(configs)} configuration(s)")
             app_state['configs_loaded'] = True
             
-            # Start the main loop in a separate thread
-            def run_main_loop():
-                while True:
-                    for config in configs:
-                        try:
-                            # Query Loki for matching logs
-                            matching_logs = query_loki(config)
-                            
-                            # Send notifications for each matching log
-                            for log_entry in matching_logs:
-                                send_slack_notification(config, log_entry, cache)
-                                
-                        except Exception as e:
-                            logger.error(f"Error processing config {config.name}: {str(e)}")
-                            app_state['error_count'] += 1
-                    
-                    # Update last check time
-                    app_state['last_check'] = datetime.now().isoformat()
-                    
-                    # Sleep for the shortest interval among all configs
-                    min_interval = min(parse_interval(config.loki.interval) for config in configs)
-                    time.sleep(min_interval)
-            
-            # Start the main loop in a separate thread
-            main_thread = threading.Thread(target=run_main_loop, daemon=True)
+            # Start the event loop running the main loop in a separate thread
+            main_thread = threading.Thread(
+                target=lambda: asyncio.run(run_main_loop(configs, cache)),
+                daemon=True
+            )
             main_thread.start()
     
-    # Start the Flask application
-    run_flask()
+    # Start the health check server
+    run_health_server()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file